@@ -22,45 +22,87 @@ Exit codes:
     2 - Error occurred during execution
 """
 
+HEADER_RE = re.compile(r"^(\w+)\[(\w+)\]: (.+)$")
+JIRA_RE = re.compile(r"^[A-Z0-9]+-[0-9]+")
+AUTHOR_RE = re.compile(r"^Author:\s+(.+?)\s+<([^>]+)>\s*$")
 
-def get_git_commits(start_rev, end_rev):
-    try:
-        # Get all commit hashes
-        result = subprocess.run(
-            ["git", "log", "--pretty=format:%H", f"{start_rev}..{end_rev}"],
-            capture_output=True,
-            text=True,
-            check=True,
+
+class GitBatch:
+    """
+    Keeps a single `git cat-file --batch` process alive so that per-commit
+    object reads go over its stdin instead of forking one git per query.
+
+    Usage:
+        with GitBatch() as batch:
+            raw_commit = batch.get(commit_hash)
+    """
+
+    def __init__(self):
+        self.proc = None
+
+    def __enter__(self):
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
         )
-        commit_hashes = result.stdout.strip().split("\n")
-        return commit_hashes
-    except subprocess.SubprocessError as e:
-        print(f"Error getting commit history: {e}")
-        sys.exit(2)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.proc.stdin.close()
+        self.proc.wait()
+        self.proc.stdout.close()
+
+    def get(self, rev):
+        self.proc.stdin.write(f"{rev}\n".encode())
+        self.proc.stdin.flush()
 
+        # The header is "<oid> <type> <size>", or "<rev> missing" /
+        # "<rev> ambiguous" when the object cannot be resolved.
+        header = self.proc.stdout.readline().split()
+        if len(header) != 3:
+            raise ValueError(f"Could not read git object {rev}")
 
-def get_commit_log(commit_hash):
+        size = int(header[2])
+        content = self.proc.stdout.read(size)
+        # Every object is followed by a newline.
+        self.proc.stdout.read(1)
+        return content
+
+
+def iter_commit_messages(start_rev, end_rev):
     try:
+        # Fetch every commit hash and message in one go; -z terminates each
+        # record with a NUL so multi-line bodies can be split safely.
         result = subprocess.run(
-            ["git", "show", "-s", f"--format=%B%nAuthor: %an <%ae>", commit_hash],
+            [
+                "git",
+                "log",
+                "-z",
+                "--pretty=format:%H%n%B%nAuthor: %an <%ae>",
+                f"{start_rev}..{end_rev}",
+            ],
             capture_output=True,
             text=True,
             check=True,
         )
-        return result.stdout.strip()
     except subprocess.SubprocessError as e:
-        print(f"Error getting log for commit {commit_hash}: {e}")
-        return None
+        print(f"Error getting commit history: {e}")
+        sys.exit(2)
+
+    for record in result.stdout.split("\0"):
+        if not record:
+            continue
+        commit_hash, _, commit_msg = record.partition("\n")
+        yield commit_hash, commit_msg.strip()
 
 
-def check_header(commit_msg):
-    header_lines = [line for line in commit_msg.split("\n") if line]
-    if not header_lines:
+def check_header(lines):
+    header = next((line for line in lines if line), None)
+    if header is None:
         return False, "Empty commit message"
 
-    header = header_lines[0]
-    header_pattern = r"^(\w+)\[(\w+)\]: (.+)$"
-    header_match = re.match(header_pattern, header)
+    header_match = HEADER_RE.match(header)
 
     if not header_match:
         return (
@@ -71,126 +113,109 @@ def check_header(commit_msg):
     return True, ""
 
 
-def check_problem_task_section(commit_msg):
-    section_started = False
-    for line in commit_msg.split("\n"):
-        if line.startswith("Problem:") or line.startswith("Task:"):
-            section_started = True
-            break
-
-    if not section_started:
-        return False, "Missing 'Problem/Task:' section"
-
-    return True, ""
-
-
-def check_solution_section(commit_msg):
-    section_started = False
-    for line in commit_msg.split("\n"):
-        if line.startswith("Solution:"):
-            section_started = True
-            break
-
-    if not section_started:
-        return False, "Missing 'Solution:' section"
+def check_author_email(author):
+    author_match = AUTHOR_RE.match(author) if author else None
+    if not author_match:
+        return False, "Missing author or email"
 
     return True, ""
 
 
-def check_test_section(commit_msg):
-    section_started = False
-    for line in commit_msg.split("\n"):
-        if line.startswith("Test:"):
-            section_started = True
-            continue
-
-    if not section_started:
-        return False, "Missing 'Test:' section"
-
-    return True, ""
-
-
-def check_jira_section(commit_msg):
-    section_started = False
-    jira = ""
-    for line in commit_msg.split("\n"):
-        if line.startswith("JIRA:"):
-            section_started = True
+def iter_commit_errors(lines):
+    is_valid, error_msg = check_header(lines)
+    if not is_valid:
+        yield error_msg
+
+    # Classify every line in a single pass, remembering which sections
+    # were seen, the content of the first JIRA line and the trailing
+    # Author line appended by iter_commit_messages.
+    has_problem_task = False
+    has_solution = False
+    has_test = False
+    jira = None
+    author = None
+    for line in lines:
+        if line.startswith("Problem:") or line.startswith("Task:"):
+            has_problem_task = True
+        elif line.startswith("Solution:"):
+            has_solution = True
+        elif line.startswith("Test:"):
+            has_test = True
+        elif line.startswith("JIRA:") and jira is None:
             jira = line.split(":")[1].strip()
-            break
-
-    if not section_started:
-        return False, "Missing 'JIRA:' section"
-
-    jira_pattern = r"^[A-Z0-9]+-[0-9]+"
-    jira_match = re.match(jira_pattern, jira)
-
-    if not jira_match:
-        return False, "JIRA reference should be in format: <PROJ-123>"
-
-    return True, ""
-
-
-def check_author_email(commit_msg):
-    # section_started = False
-    # author = ""
-    # email = ""
-    # for line in commit_msg.split("\n"):
-    #     if line.startswith("Author:"):
-    #         section_started = True
-    #         author = line.split()[1].strip()
-    #         email = line.split()[2].strip()
-    #         continue
-    #
-    # if not section_started:
-    #     return False, "Missing author or email"
-    #
-    # if f"<{author}@is.ic>" != email:
-    #     return False, f"{author} {email}: email does not format: <username>@is.ic"
-    #
-    return True, ""
-
-
-def validate_commit(commit_msg):
-    checks = [
-        check_header,
-        check_problem_task_section,
-        check_solution_section,
-        check_test_section,
-        check_jira_section,
-        check_author_email,
-    ]
-
-    error_msgs = []
-    for check_func in checks:
-        is_valid, error_msg = check_func(commit_msg)
-        if not is_valid:
-            error_msgs.append(error_msg)
-
+        elif line.startswith("Author:"):
+            author = line
+
+    if not has_problem_task:
+        yield "Missing 'Problem/Task:' section"
+    if not has_solution:
+        yield "Missing 'Solution:' section"
+    if not has_test:
+        yield "Missing 'Test:' section"
+    if jira is None:
+        yield "Missing 'JIRA:' section"
+    elif not JIRA_RE.match(jira):
+        yield "JIRA reference should be in format: <PROJ-123>"
+
+    is_valid, error_msg = check_author_email(author)
+    if not is_valid:
+        yield error_msg
+
+
+def validate_commit(commit_msg, verbose=False):
+    errors = iter_commit_errors(commit_msg.split("\n"))
+
+    # The errors are produced lazily, so stopping at the first one skips
+    # every check after it.
+    if not verbose:
+        error_msg = next(errors, None)
+        if error_msg is None:
+            return True, []
+        return False, [error_msg]
+
+    error_msgs = list(errors)
     if error_msgs:
         return False, error_msgs
 
     return True, []
 
 
-def check_mr_logs(start_rev, end_rev):
-    commit_hashes = get_git_commits(start_rev, end_rev)
-    error_commits = []
+def check_mr_logs(start_rev, end_rev, verbose=False):
+    # An identical start and end revision is an empty range, no need to ask git.
+    if start_rev == end_rev:
+        print("No commits in range.")
+        return True
 
-    for commit_hash in commit_hashes:
-        commit_msg = get_commit_log(commit_hash)
-        if not commit_msg:
-            print(f"Could not get log for commit {commit_hash}")
-            return False
+    error_commits = []
+    has_commits = False
 
-        is_valid, error_msgs = validate_commit(commit_msg)
+    for commit_hash, commit_msg in iter_commit_messages(start_rev, end_rev):
+        has_commits = True
+        is_valid, error_msgs = validate_commit(commit_msg, verbose)
         if not is_valid:
             error_commits.extend([(commit_hash, error_msg) for error_msg in error_msgs])
+            # Stop at the first bad commit unless a full report was requested.
+            if not verbose:
+                break
+
+    if not has_commits:
+        print("No commits in range.")
+        return True
 
     if error_commits:
-        print(f"Found {len(error_commits)} commits that don't match the template:")
-        for commit_hash, error_msg in error_commits:
-            print(f"- Commit {commit_hash}: {error_msg}")
+        if verbose:
+            print(f"Found {len(error_commits)} commits that don't match the template:")
+        else:
+            print("Found a commit that doesn't match the template:")
+        sys.stdout.write(
+            "\n".join(
+                f"- Commit {commit_hash}: {error_msg}"
+                for commit_hash, error_msg in error_commits
+            )
+            + "\n"
+        )
+        if not verbose:
+            print("Stopped at the first error, rerun with --verbose for a full report.")
         return False
 
     print("All commits match the template!")
@@ -208,7 +233,12 @@ if __name__ == "__main__":
     parser.add_argument(
         "--end-rev", type=str, required=True, help="Compute changes to this revision"
     )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Report every template violation instead of stopping at the first one",
+    )
 
     args = parser.parse_args()
-    if not check_mr_logs(args.start_rev, args.end_rev):
+    if not check_mr_logs(args.start_rev, args.end_rev, args.verbose):
         sys.exit(1)
@@ -5,10 +5,13 @@
 # ==-------------------------------------------------------------------------==#
 
 import argparse
+import concurrent.futures
+import io
 import os
+import shutil
 import subprocess
 import sys
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, TextIO, Tuple
 
 """
 For C/C++ code it uses clang-format and for Python code it uses ruff.
@@ -27,6 +30,19 @@ Exit codes:
     1 - At least one code formatter completed with failure
 """
 
+CPP_EXTS = (
+    ".cpp",
+    ".c",
+    ".cc",
+    ".h",
+    ".hpp",
+    ".hxx",
+    ".cxx",
+    ".inc",
+    ".cppm",
+    ".cl",
+)
+
 
 class FormatArgs:
     start_rev: Optional[str] = None
@@ -54,18 +70,24 @@ class FormatHelper:
     def has_tool(self) -> bool:
         raise NotImplementedError()
 
-    def format_run(self, changed_files: List[str], args: FormatArgs) -> Optional[str]:
+    def format_run(
+        self, changed_files: List[str], args: FormatArgs, log: Optional[TextIO] = None
+    ) -> Optional[str]:
         raise NotImplementedError()
 
-    def run(self, changed_files: List[str], args: FormatArgs) -> bool:
-        diff = self.format_run(changed_files, args)
+    def run(
+        self, changed_files: List[str], args: FormatArgs, log: Optional[TextIO] = None
+    ) -> bool:
+        # Progress, stderr and diffs go to log, or to sys.stdout when unset.
+        diff = self.format_run(changed_files, args, log)
 
         if diff is None:
             return True
         elif len(diff) > 0:
             print(
                 f"Warning: {self.friendly_name}, {self.name} detected "
-                "some issues with your code formatting..."
+                "some issues with your code formatting...",
+                file=log,
             )
             return False
         else:
@@ -73,7 +95,8 @@ class FormatHelper:
             # infrastructure failure).
             print(
                 f"Warning: The {self.friendly_name} failed without printing "
-                "a diff. Check the logs for stderr output. :warning:"
+                "a diff. Check the logs for stderr output. :warning:",
+                file=log,
             )
             return False
 
@@ -89,26 +112,22 @@ class ClangFormatHelper(FormatHelper):
     def should_include_extensionless_file(self, path: str) -> bool:
         return path.startswith("libcxx/include")
 
-    def filter_changed_files(self, changed_files: List[str]) -> List[str]:
+    def filter_changed_files(
+        self, changed_files: List[str]
+    ) -> Tuple[List[str], Set[str]]:
+        # Gather the extension of every kept file on the way, excluding periods
+        # since git-clang-format takes extensions without them.
         filtered_files = []
+        extensions: Set[str] = set()
         for path in changed_files:
-            _, ext = os.path.splitext(path)
-            if ext in (
-                ".cpp",
-                ".c",
-                ".cc",
-                ".h",
-                ".hpp",
-                ".hxx",
-                ".cxx",
-                ".inc",
-                ".cppm",
-                ".cl",
-            ):
-                filtered_files.append(path)
-            elif ext == "" and self.should_include_extensionless_file(path):
+            if path.endswith(CPP_EXTS):
                 filtered_files.append(path)
-        return filtered_files
+                extensions.add(path.rsplit(".", 1)[1])
+            elif "." not in os.path.basename(path):
+                if self.should_include_extensionless_file(path):
+                    filtered_files.append(path)
+                    extensions.add("")
+        return filtered_files, extensions
 
     @property
     def clang_fmt_path(self) -> str:
@@ -117,16 +136,12 @@ class ClangFormatHelper(FormatHelper):
         return "git-clang-format"
 
     def has_tool(self) -> bool:
-        cmd = [self.clang_fmt_path, "-h"]
-        proc = None
-        try:
-            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except:
-            return False
-        return proc.returncode == 0
+        return shutil.which(self.clang_fmt_path) is not None
 
-    def format_run(self, changed_files: List[str], args: FormatArgs) -> Optional[str]:
-        cpp_files = self.filter_changed_files(changed_files)
+    def format_run(
+        self, changed_files: List[str], args: FormatArgs, log: Optional[TextIO] = None
+    ) -> Optional[str]:
+        cpp_files, extensions = self.filter_changed_files(changed_files)
         if not cpp_files:
             return None
 
@@ -136,14 +151,8 @@ class ClangFormatHelper(FormatHelper):
             cf_cmd.append(args.start_rev)
             cf_cmd.append(args.end_rev)
 
-        # Gather the extension of all modified files and pass them explicitly to git-clang-format.
+        # Pass the extension of all modified files explicitly to git-clang-format.
         # This prevents git-clang-format from applying its own filtering rules on top of ours.
-        extensions = set()
-        for file in cpp_files:
-            _, ext = os.path.splitext(file)
-            extensions.add(
-                ext.strip(".")
-            )  # Exclude periods since git-clang-format takes extensions without them
         cf_cmd.append("--extensions")
         cf_cmd.append(",".join(extensions))
 
@@ -151,18 +160,24 @@ class ClangFormatHelper(FormatHelper):
         cf_cmd += cpp_files
 
         if args.verbose:
-            print(f"Running: {' '.join(cf_cmd)}")
+            print(f"Running: {' '.join(cf_cmd)}", file=log)
         self.cf_cmd = cf_cmd
-        proc = subprocess.run(cf_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        sys.stdout.write(proc.stderr.decode("utf-8"))
+        proc = subprocess.run(
+            cf_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding="utf-8"
+        )
+        print(proc.stderr, end="", file=log)
 
         if proc.returncode != 0:
             # formatting needed, or the command otherwise failed
+            out = proc.stdout
             if args.verbose:
-                print(f"error: {self.name} exited with code {proc.returncode}")
+                print(
+                    f"error: {self.name} exited with code {proc.returncode}",
+                    file=log,
+                )
                 # Print the diff in the log so that it is viewable there
-                print(proc.stdout.decode("utf-8"))
-            return proc.stdout.decode("utf-8")
+                print(out, file=log)
+            return out
         else:
             return None
 
@@ -176,13 +191,7 @@ class RuffFormatHelper(FormatHelper):
         return " ".join(self.ruff_cmd)
 
     def filter_changed_files(self, changed_files: List[str]) -> List[str]:
-        filtered_files = []
-        for path in changed_files:
-            name, ext = os.path.splitext(path)
-            if ext == ".py":
-                filtered_files.append(path)
-
-        return filtered_files
+        return [path for path in changed_files if path.endswith(".py")]
 
     @property
     def ruff_fmt_path(self) -> str:
@@ -191,15 +200,11 @@ class RuffFormatHelper(FormatHelper):
         return "ruff"
 
     def has_tool(self) -> bool:
-        cmd = [self.ruff_fmt_path, "--version"]
-        proc = None
-        try:
-            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except:
-            return False
-        return proc.returncode == 0
+        return shutil.which(self.ruff_fmt_path) is not None
 
-    def format_run(self, changed_files: List[str], args: FormatArgs) -> Optional[str]:
+    def format_run(
+        self, changed_files: List[str], args: FormatArgs, log: Optional[TextIO] = None
+    ) -> Optional[str]:
         py_files = self.filter_changed_files(changed_files)
         if not py_files:
             return None
@@ -214,21 +219,27 @@ class RuffFormatHelper(FormatHelper):
         ruff_cmd.append("--")
         ruff_cmd += py_files
         if args.verbose:
-            print(f"Running: {' '.join(ruff_cmd)}")
+            print(f"Running: {' '.join(ruff_cmd)}", file=log)
         self.ruff_cmd = ruff_cmd
-        proc = subprocess.run(ruff_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        proc = subprocess.run(
+            ruff_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding="utf-8"
+        )
         if args.verbose:
-            sys.stdout.write(proc.stderr.decode("utf-8"))
+            print(proc.stderr, end="", file=log)
 
+        out = proc.stdout
         if proc.returncode != 0:
             # formatting needed, or the command otherwise failed
             if args.verbose:
-                print(f"error: {self.name} exited with code {proc.returncode}")
+                print(
+                    f"error: {self.name} exited with code {proc.returncode}",
+                    file=log,
+                )
                 # Print the diff in the log so that it is viewable there
-                print(proc.stdout.decode("utf-8"))
-            return proc.stdout.decode("utf-8")
+                print(out, file=log)
+            return out
         else:
-            sys.stdout.write(proc.stdout.decode("utf-8"))
+            print(out, end="", file=log)
             return None
 
 
@@ -264,10 +275,39 @@ if __name__ == "__main__":
     if args.changed_files:
         changed_files = args.changed_files.split(",")
 
-    failed_formatters = []
-    for fmt in ALL_FORMATTERS:
-        if not fmt.run(changed_files, args):
-            failed_formatters.append(fmt.name)
+    # Hand each formatter only its own share of the changed files. The
+    # filters are idempotent, so format_run filtering again is cheap.
+    ruff_fmt, clang_fmt = ALL_FORMATTERS
+    cpp_files, _ = clang_fmt.filter_changed_files(changed_files)
+    files_by_formatter = {
+        ruff_fmt.name: ruff_fmt.filter_changed_files(changed_files),
+        clang_fmt.name: cpp_files,
+    }
+
+    # Only dispatch the formatters that have matching files to look at.
+    formatters = [fmt for fmt in ALL_FORMATTERS if files_by_formatter[fmt.name]]
+
+    # The formatters are independent and spend their time waiting on
+    # subprocesses, so run them concurrently.
+    results = {}
+    if formatters:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(formatters)
+        ) as executor:
+            # Buffer each formatter's output and print it in ALL_FORMATTERS
+            # order once it is done, so the logs do not interleave.
+            logs: Dict[str, io.StringIO] = {}
+            futures = {}
+            for fmt in formatters:
+                logs[fmt.name] = io.StringIO()
+                futures[fmt.name] = executor.submit(
+                    fmt.run, files_by_formatter[fmt.name], args, logs[fmt.name]
+                )
+            for fmt in formatters:
+                results[fmt.name] = futures[fmt.name].result()
+                sys.stdout.write(logs[fmt.name].getvalue())
+
+    failed_formatters = [name for name, ok in results.items() if not ok]
 
     if len(failed_formatters) > 0:
         print(f"error: some formatters failed: {' '.join(failed_formatters)}")
@@ -6,6 +6,7 @@
 
 import argparse
 import os
+import shutil
 import subprocess
 import sys
 from typing import List, Optional
@@ -24,6 +25,8 @@ Exit codes:
     1 - Static typing for python with failure
 """
 
+SKIP_FILES = frozenset({"test/unittests/lit.cfg.py"})
+
 
 class TypingArgs:
     changed_files: Optional[str] = None
@@ -67,13 +70,11 @@ class MypyHelper(TypingHelper):
         return " ".join(self.mypy_cmd)
 
     def filter_changed_files(self, changed_files: List[str]) -> List[str]:
-        filtered_files = []
-        for path in changed_files:
-            name, ext = os.path.splitext(path)
-            if ext == ".py":
-                filtered_files.append(path)
-
-        return filtered_files
+        return [
+            path
+            for path in changed_files
+            if path.endswith(".py") and path not in SKIP_FILES
+        ]
 
     @property
     def mypy_path(self) -> str:
@@ -82,13 +83,7 @@ class MypyHelper(TypingHelper):
         return "mypy"
 
     def has_tool(self) -> bool:
-        cmd = [self.mypy_path, "--version"]
-        proc = None
-        try:
-            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except:
-            return False
-        return proc.returncode == 0
+        return shutil.which(self.mypy_path) is not None
 
     def typing_run(self, changed_files: List[str], args: TypingArgs) -> bool:
         py_files = self.filter_changed_files(changed_files)
@@ -103,17 +98,20 @@ class MypyHelper(TypingHelper):
         if args.verbose:
             print(f"Running: {' '.join(mypy_cmd)}")
         self.mypy_cmd = mypy_cmd
-        proc = subprocess.run(mypy_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        proc = subprocess.run(
+            mypy_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding="utf-8"
+        )
         if args.verbose:
-            sys.stdout.write(proc.stderr.decode("utf-8"))
+            sys.stdout.write(proc.stderr)
 
+        out = proc.stdout
         if proc.returncode != 0:
             if args.verbose:
                 print(f"error: {self.name} exited with code {proc.returncode}")
-                print(proc.stdout.decode("utf-8"))
+                print(out)
             return False
         else:
-            sys.stdout.write(proc.stdout.decode("utf-8"))
+            sys.stdout.write(out)
             return True
 
 
@@ -131,9 +129,6 @@ if __name__ == "__main__":
     if args.changed_files:
         changed_files = args.changed_files.split(",")
     
-    # Filter out file test/unittests/lit.cfg.py
-    changed_files = [f for f in changed_files if f != "test/unittests/lit.cfg.py"]
-
     helper = MypyHelper()
     if not helper.has_tool():
         print(f"error: {helper.name} is not installed or not found in PATH")
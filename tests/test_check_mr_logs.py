@@ -0,0 +1,237 @@
+import os
+import subprocess
+
+import pytest
+from check_mr_logs import (
+  GitBatch,
+  check_author_email,
+  check_mr_logs,
+  iter_commit_errors,
+  iter_commit_messages,
+  validate_commit,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AUTHOR = "\nAuthor: tester <tester@is.ic>"
+VALID_MSG = (
+  "feat[CI]: add checker\n\n"
+  "Problem:\n  - p\n\n"
+  "Solution:\n  - s\n\n"
+  "Test:\n  - t\n\n"
+  "JIRA: ABC-123"
+)
+
+HEADER_ERROR = "Invalid header format. Should be: <type>[<SCOPE>]: <short-summary>"
+PROBLEM_ERROR = "Missing 'Problem/Task:' section"
+SOLUTION_ERROR = "Missing 'Solution:' section"
+TEST_ERROR = "Missing 'Test:' section"
+JIRA_ERROR = "Missing 'JIRA:' section"
+JIRA_FORMAT_ERROR = "JIRA reference should be in format: <PROJ-123>"
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+  """
+  在临时目录中创建 git 仓库, 返回一个用于提交的函数
+  """
+  monkeypatch.chdir(tmp_path)
+
+  def git(*args):
+    return subprocess.run(
+      ["git", *args], check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+  git("init", "-q")
+  git("config", "user.name", "tester")
+  git("config", "user.email", "tester@is.ic")
+
+  def commit(msg):
+    git("commit", "-q", "--allow-empty", "-m", msg)
+    return git("rev-parse", "HEAD")
+
+  commit("init")
+  return commit
+
+
+# 1. 合法的 Author 行
+@pytest.mark.parametrize(
+  "author",
+  [
+    "Author: tester <tester@is.ic>",
+    "Author: Full Name <full.name@example.com>",
+    "Author: Full Name <full.name@example.com>  ",
+  ],
+)
+def test_valid_author(author):
+  """
+  测试格式正确的 Author 行
+  """
+  assert check_author_email(author) == (True, "")
+
+
+# 2. 格式错误或缺失的 Author 行
+@pytest.mark.parametrize(
+  "author",
+  [
+    # 缺失
+    None,
+    "",
+    # 缺少邮箱
+    "Author: tester",
+    "Author: A B <>",
+    # 缺少名字
+    "Author: <tester@is.ic>",
+    # 邮箱没有闭合
+    "Author: tester <tester@is.ic",
+  ],
+)
+def test_invalid_author(author):
+  """
+  测试格式错误或缺失的 Author 行
+  """
+  assert check_author_email(author) == (False, "Missing author or email")
+
+
+# 3. GitBatch 通过同一个 git cat-file 进程读取对象
+def test_git_batch_get(monkeypatch):
+  """
+  测试读取提交对象以及不存在的对象
+  """
+  monkeypatch.chdir(REPO_ROOT)
+  with GitBatch() as batch:
+    commit = batch.get("HEAD")
+    assert isinstance(commit, bytes)
+    assert commit.startswith(b"tree ")
+    with pytest.raises(ValueError):
+      batch.get("no-such-rev")
+    # 出错之后进程仍然可用
+    assert batch.get("HEAD") == commit
+
+
+# 4. 每条提交信息的全部错误, 期望值与原先逐项检查的结果一致
+@pytest.mark.parametrize(
+  "commit_msg, expected",
+  [
+    (VALID_MSG, []),
+    ("fix[CORE]: y\n\nTask: t\nSolution: s\nTest: t\nJIRA: CORE-1", []),
+    # 头部格式错误
+    ("bad\n\nProblem: p\nSolution: s\nTest: t\nJIRA: ABC-1", [HEADER_ERROR]),
+    # 缺少所有段落
+    (
+      "bad",
+      [HEADER_ERROR, PROBLEM_ERROR, SOLUTION_ERROR, TEST_ERROR, JIRA_ERROR],
+    ),
+    # 只检查第一个 JIRA 行
+    ("fix[CI]: y\n\nTask: t\nSolution: s\nTest: t\nJIRA: nope", [JIRA_FORMAT_ERROR]),
+    (
+      "fix[CI]: y\n\nTask: t\nSolution: s\nTest: t\nJIRA: nope\nJIRA: ABC-1",
+      [JIRA_FORMAT_ERROR],
+    ),
+    ("fix[CI]: y\n\nProblem: p\nSolution: s\nJIRA: ABC-1", [TEST_ERROR]),
+    # 段落必须顶格书写
+    (
+      "fix[CI]: y\n\n Problem: p\n Solution: s\n Test: t\n JIRA: ABC-1",
+      [PROBLEM_ERROR, SOLUTION_ERROR, TEST_ERROR, JIRA_ERROR],
+    ),
+  ],
+)
+def test_iter_commit_errors(commit_msg, expected):
+  """
+  测试单次遍历得到的错误及其顺序
+  """
+  lines = (commit_msg + AUTHOR).split("\n")
+  assert list(iter_commit_errors(lines)) == expected
+  assert validate_commit(commit_msg + AUTHOR, verbose=True) == (
+    not expected,
+    expected,
+  )
+
+
+# 5. 非 verbose 模式只返回第一个错误
+def test_validate_commit_first_error_only():
+  """
+  测试默认模式在第一个错误处停止
+  """
+  assert validate_commit("bad" + AUTHOR) == (False, [HEADER_ERROR])
+  assert validate_commit(VALID_MSG + AUTHOR) == (True, [])
+  # 缺少 Author 行
+  assert validate_commit(VALID_MSG, verbose=True) == (
+    False,
+    ["Missing author or email"],
+  )
+
+
+# 6. 一次 git log 读取所有提交
+def test_iter_commit_messages(git_repo):
+  """
+  测试按 NUL 分隔的提交记录解析
+  """
+  first = git_repo(VALID_MSG)
+  second = git_repo("bad\n\nbody line\n\nlast line")
+
+  # %B 保留了提交信息末尾的换行
+  assert list(iter_commit_messages("HEAD~2", "HEAD")) == [
+    (second, "bad\n\nbody line\n\nlast line\n" + AUTHOR),
+    (first, VALID_MSG + "\n" + AUTHOR),
+  ]
+  assert list(iter_commit_messages("HEAD", "HEAD")) == []
+
+
+# 7. check_mr_logs 的输出
+def test_check_mr_logs_valid(git_repo, capsys):
+  """
+  测试所有提交都符合模板
+  """
+  git_repo(VALID_MSG)
+  assert check_mr_logs("HEAD~1", "HEAD")
+  assert capsys.readouterr().out == "All commits match the template!\n"
+
+
+def test_check_mr_logs_first_error(git_repo, capsys):
+  """
+  测试默认模式只报告第一个错误并提示使用 --verbose
+  """
+  bad = git_repo("bad")
+  git_repo(VALID_MSG)
+  assert not check_mr_logs("HEAD~2", "HEAD")
+  assert capsys.readouterr().out == (
+    "Found a commit that doesn't match the template:\n"
+    f"- Commit {bad}: {HEADER_ERROR}\n"
+    "Stopped at the first error, rerun with --verbose for a full report.\n"
+  )
+
+
+def test_check_mr_logs_verbose(git_repo, capsys):
+  """
+  测试 verbose 模式报告所有错误
+  """
+  first = git_repo("bad")
+  second = git_repo("fix[CI]: y\n\nTask: t\nSolution: s\nTest: t\nJIRA: nope")
+  assert not check_mr_logs("HEAD~2", "HEAD", verbose=True)
+  assert capsys.readouterr().out == (
+    "Found 6 commits that don't match the template:\n"
+    f"- Commit {second}: {JIRA_FORMAT_ERROR}\n"
+    f"- Commit {first}: {HEADER_ERROR}\n"
+    f"- Commit {first}: {PROBLEM_ERROR}\n"
+    f"- Commit {first}: {SOLUTION_ERROR}\n"
+    f"- Commit {first}: {TEST_ERROR}\n"
+    f"- Commit {first}: {JIRA_ERROR}\n"
+  )
+
+
+@pytest.mark.parametrize(
+  "start_rev, end_rev",
+  [
+    ("HEAD", "HEAD"),
+    # 范围为空
+    ("HEAD", "HEAD~1"),
+  ],
+)
+def test_check_mr_logs_empty_range(git_repo, capsys, start_rev, end_rev):
+  """
+  测试没有提交的范围
+  """
+  git_repo("bad")
+  assert check_mr_logs(start_rev, end_rev)
+  assert capsys.readouterr().out == "No commits in range.\n"